@@ -4,20 +4,44 @@ Hacktown 2025 Event Scraper - Async Version
 Scrapes all events from the Hacktown 2025 API with concurrent requests
 """
 
+import argparse
 import asyncio
-import aiohttp
-import json
+import hashlib
+import httpx
+import orjson
 import os
 import random
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import cache
 import time
 from typing import List, Dict, Any, Optional
 from zoneinfo import ZoneInfo
 import logging
 
+# pyahocorasick is optional; without it locations are matched with a plain scan
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# uvloop is optional as well (requirements.txt skips it on Windows, where it
+# doesn't exist); without it asyncio's own event loop is used
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configuration
 BASE_URL = "https://hacktown-2025-ss-v2.api.yazo.com.br/public/schedules"
 OUTPUT_DIR = "events"
+NDJSON_FILENAME = "hacktown_events.ndjson"  # Output of --ndjson mode
+LOCATION_CACHE_FILE = os.path.join(OUTPUT_DIR, "_loc_cache.json")  # Locations resolved by earlier runs
+# Keyword -> location table, shipped next to the script rather than read from the working directory
+LOCATION_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "location_rules.json")
+BRT = ZoneInfo('America/Sao_Paulo')  # Brasília Time, used for all timestamps
 
 # Detect if running in CI
 IS_CI = os.environ.get('CI', 'false').lower() == 'true' or os.environ.get('GITHUB_ACTIONS', 'false').lower() == 'true'
@@ -26,13 +50,32 @@ IS_CI = os.environ.get('CI', 'false').lower() == 'true' or os.environ.get('GITHU
 if IS_CI:
     MAX_CONCURRENT_REQUESTS = 1  # More conservative in CI
     RETRY_DELAY = 10  # Longer initial delay in CI
+    REQUESTS_PER_SECOND = 0.2  # Global request rate, one per 5 s like the old 3-7 s CI delay
+    RATE_LIMIT_BURST = 1  # No back-to-back requests; the API answers bursts with 403
     print("Running in CI environment - using conservative settings")
 else:
     MAX_CONCURRENT_REQUESTS = 2  # Normal setting for local
     RETRY_DELAY = 5  # Normal delay for local
+    REQUESTS_PER_SECOND = 2.0  # Global request rate for local
+    RATE_LIMIT_BURST = 3  # Requests that may go out back to back before pacing kicks in
 
 MAX_RETRIES = 5
+SPECULATIVE_PAGES = 8  # pages requested per date before last_page is known
+MAX_RETRY_DELAY = 30  # seconds, cap for exponential backoff
 REQUEST_TIMEOUT = 30  # seconds
+WRITER_THREADS = 2  # worker threads serializing and writing output files
+ADMISSION_RECOVERY_SUCCESSES = 10  # successes in a row before a 403-lowered concurrency limit goes back up
+
+# Circuit breaker: after this many consecutive failed attempts across all
+# pages, stop sending requests for a cooldown instead of retrying each page;
+# after the cooldown a single probe request decides whether to resume or to
+# give up on the rest of the run. Kept
+# below MAX_RETRIES so the breaker opens before the failing page runs out of retries
+CIRCUIT_BREAKER_THRESHOLD = 4
+CIRCUIT_BREAKER_COOLDOWN = 30  # seconds
+
+# Statuses worth retrying; the API answers 403 when it rate limits us
+RETRYABLE_STATUSES = {403, 429, 500, 502, 503, 504}
 
 # Event dates
 EVENT_DATES = [
@@ -53,370 +96,683 @@ HEADERS = {
     'referer': 'https://hacktown2025.yazo.app.br/',
 }
 
+# Serializes appends from concurrent date workers to the NDJSON file
+ndjson_lock = threading.Lock()
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Location normalization cache
-location_cache = {}
-
-
-def normalize_and_locate(place: str) -> tuple[str, str]:
+def load_location_rules() -> tuple:
     """
-    Normalize location names and define near location with caching
-    Returns: (filter_location, near_location)
+    Load the location table from LOCATION_RULES_FILE, a JSON list of
+    {"keywords": [...], "filter": ..., "near": ...} entries in priority order
+    Returns: ((keywords, filter_location, near_location), ...)
     """
-    if not place:
-        return "Other", "Other"
-
-    # Check cache first
-    if place in location_cache:
-        return location_cache[place]
-
-    # Define location mappings
-    place_upper = place.upper()
-    filter_location = "Other"
-    near_location = "Other"
-
-    if "INATEL" in place_upper:
-        filter_location = "Inatel"
-        near_location = "Inatel e Arredores"
+    with open(LOCATION_RULES_FILE, 'rb') as f:
+        rules = orjson.loads(f.read())
+    return tuple((tuple(rule['keywords']), rule['filter'], rule['near']) for rule in rules)
 
-    elif "ETE" in place_upper:
-        filter_location = "ETE"
-        near_location = "ETE e Arredores"
 
-    elif "LOJA MAÇONICA" in place_upper or "LOJA MAÇÔNICA" in place_upper:
-        filter_location = "Loja Maçônica"
-        near_location = "Praça e Arredores"
+# Location rules in priority order: (keywords, filter_location, near_location).
+# The first rule with any keyword in the uppercased place wins.
+LOCATION_RULES = load_location_rules()
 
-    elif "REAL PALACE" in place_upper:
-        filter_location = "Real Palace"
-        near_location = "Praça e Arredores"
 
-    elif "BRASEIRO" in place_upper:
-        filter_location = "Braseiro"
-        near_location = "Praça e Arredores"
+def build_location_automaton() -> Optional['ahocorasick.Automaton']:
+    """
+    Build an Aho-Corasick automaton over every LOCATION_RULES keyword, with the
+    rule index as the value, so one pass over a place reports all keyword
+    occurrences (overlaps included). None when pyahocorasick isn't installed
+    """
+    if ahocorasick is None:
+        return None
 
-    elif "BOTECO DO TIO" in place_upper:
-        filter_location = "Boteco do Tio João"
-        near_location = "Praça e Arredores"
+    automaton = ahocorasick.Automaton()
+    for index, (keywords, _, _) in enumerate(LOCATION_RULES):
+        for keyword in keywords:
+            automaton.add_word(keyword, index)
+    automaton.make_automaton()
+    return automaton
 
-    elif "ASSOCIAÇÃO" in place_upper:
-        filter_location = "Associação José do Patrocínio"
-        near_location = "Praça e Arredores"
 
-    elif "BAR E RESTAURANTE" in place_upper:
-        filter_location = "Bar e Restaurante do Dimas II"
-        near_location = "Praça e Arredores"
+LOCATION_AUTOMATON = build_location_automaton()
 
-    elif "ESCOLA S" in place_upper:
-        filter_location = "Escola Sanico Teles"
-        near_location = "Praça e Arredores"
 
-    elif "CASA DINAMARCA" in place_upper:
-        filter_location = "Casa Dinamarca"
-        near_location = "Inatel e Arredores"
+def match_location(place: str) -> tuple[str, str]:
+    """
+    Classify a non-empty place against LOCATION_RULES with a full scan
+    Returns: (filter_location, near_location)
+    """
+    place_upper = place.upper()
 
-    elif "CASA MFM" in place_upper:
-        filter_location = "Casa MFM"
-        near_location = "Inatel e Arredores"
+    if LOCATION_AUTOMATON is None:
+        # Without pyahocorasick, scan the table in order; first match wins
+        rule = next((rule for rule in LOCATION_RULES if any(keyword in place_upper for keyword in rule[0])), None)
+    else:
+        # The lowest rule index among the matches is the first rule in order
+        priority = min((index for _, index in LOCATION_AUTOMATON.iter(place_upper)), default=None)
+        rule = None if priority is None else LOCATION_RULES[priority]
 
-    elif "CASA DO CCCF" in place_upper:
-        filter_location = "Casa do CCCF"
-        near_location = "Praça e Arredores"
+    if rule is None:
+        # Return the original place for unmapped locations
+        return place, None
 
-    elif "PALCO UNDERSTREAM" in place_upper:
-        filter_location = "Palco UNDERSTREAM"
-        near_location = "Praça e Arredores"
+    _, filter_location, near_location = rule
+    return filter_location, near_location
 
-    elif "INCUBADORA MUNICIPAL" in place_upper:
-        filter_location = "Incubadora Municipal"
-        near_location = "Praça e Arredores"
 
-    elif "CASA GOOGLE CLOUD" in place_upper:
-        filter_location = "Casa Google Cloud"
-        near_location = "Inatel e Arredores"
+# Places the API already sends in canonical form ("Be Bold", "Loja Maçônica")
+# resolve with one dict lookup; built through the full scan so both paths agree
+CANONICAL_LOCATIONS = {
+    filter_location: match_location(filter_location) for _, filter_location, _ in LOCATION_RULES
+}
 
-    elif "CASA FUTUROS POSSÍVEIS" in place_upper:
-        filter_location = "Casa Futuros Possíveis - Maria Maria Gastrobar"
-        near_location = "Praça e Arredores"
 
-    elif "PALCO MULTIEXPERIÊNCIAS" in place_upper:
-        filter_location = "Palco MultiExperiências"
-        near_location = "ETE e Arredores"
+def location_rules_fingerprint() -> str:
+    """
+    Hash of LOCATION_RULES, stored with the location cache so editing the
+    rules invalidates locations resolved under the old ones
+    """
+    return hashlib.sha256(orjson.dumps(LOCATION_RULES)).hexdigest()
 
-    elif "CIRCUITO SESC AMANTIKIR" in place_upper:
-        filter_location = "Circuito SESC Amantikir"
-        near_location = "Praça e Arredores"
 
-    elif "MIMMA" in place_upper:
-        filter_location = "Mimma's"
-        near_location = "Praça e Arredores"
+def load_location_cache() -> Dict[str, tuple[str, str]]:
+    """
+    Load the places resolved by earlier runs, or nothing if the file is
+    missing, unreadable or was written for different LOCATION_RULES
+    Returns: {place: (filter_location, near_location)}
+    """
+    try:
+        with open(LOCATION_CACHE_FILE, 'rb') as f:
+            location_cache = orjson.loads(f.read())
+
+        if location_cache.get('rules') != location_rules_fingerprint():
+            logger.info("Location rules changed, discarding location cache")
+            return {}
+        locations = {}
+        for place, location in location_cache['locations'].items():
+            if not isinstance(location, list) or len(location) != 2:
+                raise ValueError(f"bad entry for {place!r}: {location!r}")
+            locations[place] = tuple(location)
+        return locations
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        # Also covers a file that parses but has the wrong shape
+        logger.warning(f"Could not load location cache: {e}")
+        return {}
+
+
+def save_location_cache():
+    """
+    Save every place resolved so far, for the next run to start warm
+    """
+    location_cache = {
+        "rules": location_rules_fingerprint(),
+        "locations": known_locations
+    }
+    # Sorted keys keep the file stable between runs that see the same places
+    with open(LOCATION_CACHE_FILE, 'wb') as f:
+        f.write(orjson.dumps(location_cache, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 
-    elif "SINHÁ MOREIRA" in place_upper or "SINHA MOREIRA" in place_upper:
-        filter_location = "Av. Sinhá Moreira"
-        near_location = "ETE e Arredores"
 
-    elif "BE BOLD" in place_upper:
-        filter_location = "Be Bold"
-        near_location = "ETE e Arredores"
+# Places resolved by this and earlier runs; grows as new places are seen
+known_locations = load_location_cache()
 
-    elif "A SER ANUNCIADO" in place_upper:
-        filter_location = "A ser anunciado"
-        near_location = "ETE e Arredores"
 
-    elif "DIJA GASTRONOMIA" in place_upper:
-        filter_location = "Dija Gastronomia"
-        near_location = "Praça e Arredores"
+@cache
+def normalize_and_locate(place: str) -> tuple[str, str]:
+    """
+    Normalize location names and define near location, memoized per place
+    and persisted across runs through known_locations
+    Returns: (filter_location, near_location)
+    """
+    if not place:
+        return "Other", "Other"
 
-    elif "FEIRA DA MANTIQUEIRA" in place_upper:
-        filter_location = "Feira da Mantiqueira"
-        near_location = "Inatel e Arredores"
+    location = CANONICAL_LOCATIONS.get(place) or known_locations.get(place) or match_location(place)
+    known_locations[place] = location
+    return location
 
-    elif "GRANDPA JOEL" in place_upper or "COFFEE SHOP" in place_upper:
-        filter_location = "Grandpa Joel´s Coffee Shop"
-        near_location = "Praça e Arredores"
 
-    elif "MERCADO MUNICIPAL" in place_upper:
-        filter_location = "Mercado Municipal"
-        near_location = "ETE e Arredores"
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter, so concurrent workers don't retry in lockstep
+    """
+    return random.uniform(0, min(MAX_RETRY_DELAY, RETRY_DELAY * (2 ** attempt)))
 
-    else:
-        # Return the original place for unmapped locations
-        filter_location = place
-        near_location = None
 
-    # Cache the result
-    result = (filter_location, near_location)
-    location_cache[place] = result
-    return result
+def retry_after_delay(response: httpx.Response) -> Optional[float]:
+    """
+    Seconds the server asked us to wait via Retry-After, capped at MAX_RETRY_DELAY
+    """
+    retry_after = response.headers.get('Retry-After', '')
+    if not retry_after.isdigit():
+        return None
+    return min(float(retry_after), MAX_RETRY_DELAY)
 
 
-async def fetch_page(session: aiohttp.ClientSession, date: str, page: int) -> Optional[Dict[str, Any]]:
+@cache
+def date_params(date: str) -> Dict[str, Any]:
     """
-    Fetch a single page of events for a given date with retry logic
+    Query parameters shared by every page of a date (everything but 'page')
     """
-    params = {
+    return {
         'category_id': '42',
         'tag_ids': '[]',
         'day[]': [date, '00:00:00.000Z'],
-        'page': str(page),
         'search': '',
         'product_ids': '[2]'
     }
 
+
+class CircuitBreaker:
+    """
+    Holds page fetches while the API is rejecting us. Closed, it counts
+    consecutive failed attempts and opens at `threshold`. Open, it holds
+    requests for `cooldown` seconds, then lets one probe through while the
+    rest wait for its outcome: a success closes it, a failure gives up, and
+    every pending and later fetch fails fast for the rest of the run so the
+    previous files and summary are kept. A probe that never reports back
+    (e.g. cancelled) is replaced after a further cooldown
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None  # monotonic time it opened; None when closed
+        self.probe = None  # future of the request probing the open circuit, if any
+        self.gave_up = False  # a probe failed; fetches fail fast until a success closes the circuit
+
+    async def acquire(self) -> Optional[asyncio.Future]:
+        """
+        Wait until a request may go out, or until the breaker gives up; callers
+        check gave_up afterwards
+        Returns: the probe future when this request is the probe, else None
+        """
+        while self.opened_at is not None and not self.gave_up:
+            if self.probe is not None:
+                probe = self.probe
+                await asyncio.wait({probe}, timeout=self.cooldown)
+                if not probe.done() and self.probe is probe:
+                    # The probe was lost; let the next waiter probe instead
+                    self.probe = None
+                continue
+
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+
+            self.probe = asyncio.get_running_loop().create_future()
+            logger.info("Circuit breaker half-open, sending a probe request")
+            return self.probe
+        return None
+
+    def release_probe(self):
+        """
+        Wake the requests waiting on the current probe
+        """
+        if self.probe is not None:
+            if not self.probe.done():
+                self.probe.set_result(None)
+            self.probe = None
+
+    def record_failure(self, probe: Optional[asyncio.Future] = None):
+        """
+        Count a failed attempt and open the circuit at the threshold. `probe`
+        is what acquire() returned; a failed probe gives up, while failures of
+        requests sent before the circuit opened are ignored
+        """
+        if self.opened_at is not None:
+            if probe is not None and probe is self.probe:
+                self.gave_up = True
+                self.release_probe()
+                logger.error("Probe failed, giving up on the remaining requests")
+            return
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.failures = 0
+            self.opened_at = time.monotonic()
+            logger.warning(f"{self.threshold} consecutive failures, "
+                           f"pausing requests for {self.cooldown} seconds")
+
+    def record_success(self):
+        """
+        Reset the consecutive failure count, closing the circuit if it was open
+        """
+        self.failures = 0
+        if self.opened_at is not None:
+            self.opened_at = None
+            self.gave_up = False
+            self.release_probe()
+            logger.info("Circuit breaker closed, resuming requests")
+
+
+# Circuit breaker shared by every page fetch
+circuit_breaker = CircuitBreaker(CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter for page requests: at most `limit` requests run at once.
+    Unlike asyncio.Semaphore the limit can be lowered while requests are in
+    flight, and each release wakes a single waiter. A lowered limit climbs back
+    towards its initial value one step per ADMISSION_RECOVERY_SUCCESSES
+    successful requests in a row
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.max_limit = limit
+        self.active = 0
+        self.successes = 0  # successful requests in a row since the last lower()
+        self.condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify(1)
+
+    async def resize(self, limit: int):
+        """
+        Change the limit; in-flight requests above a lowered limit finish normally
+        """
+        async with self.condition:
+            self.limit = limit
+            self.condition.notify_all()
+
+    async def lower(self):
+        """
+        Drop the limit by one (never below 1) after a rate limit response
+        """
+        self.successes = 0
+        if self.limit > 1:
+            logger.warning(f"Rate limited, lowering concurrency to {self.limit - 1}")
+            await self.resize(self.limit - 1)
+
+    async def record_success(self):
+        """
+        Count a successful request, raising a lowered limit by one once enough
+        have succeeded in a row
+        """
+        if self.limit >= self.max_limit:
+            return
+        self.successes += 1
+        if self.successes >= ADMISSION_RECOVERY_SUCCESSES:
+            self.successes = 0
+            logger.info(f"No rate limiting for a while, raising concurrency to {self.limit + 1}")
+            await self.resize(self.limit + 1)
+
+
+class TokenBucket:
+    """
+    Global request pacing shared by every page fetch: tokens refill at `rate`
+    per second up to `burst`, and each request takes one, waiting only when
+    the bucket is empty. Waiters are served in arrival order
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def fetch_page(client: httpx.AsyncClient, date: str, page: int,
+                     admission: AdmissionController, bucket: TokenBucket) -> Optional[Dict[str, Any]]:
+    """
+    Fetch a single page of events for a given date with retry logic.
+    A 403 (the API's rate limit) also lowers the admission limit by one,
+    and successes raise it back
+    """
+    # Encode the query once per page rather than on every retry
+    url = httpx.URL(BASE_URL, params={**date_params(date), 'page': str(page)})
+
     for attempt in range(MAX_RETRIES):
         try:
-            # Add random delay before request to appear more human-like
-            if IS_CI:
-                await asyncio.sleep(random.uniform(3, 7))  # Longer delay in CI
-            else:
-                await asyncio.sleep(random.uniform(0.5, 1.5))
-            
-            async with session.get(
-                    BASE_URL,
-                    headers=HEADERS,
-                    params=params,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
-            ) as response:
-                if response.status == 200:
-                    return await response.json()
-                elif response.status == 403 and attempt < MAX_RETRIES - 1:
-                    logger.warning(f"403 error for {date} page {page}, attempt {attempt + 1}, retrying...")
-                    # Exponential backoff with jitter, capped between 5 and 30 seconds
-                    base_delay = RETRY_DELAY * (2 ** attempt) + random.uniform(0, 5)
-                    retry_delay = max(5, min(base_delay, 30))  # Clamp between 5 and 30 seconds
-                    logger.info(f"Waiting {retry_delay:.1f} seconds before retry...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                else:
-                    logger.error(f"HTTP {response.status} for {date} page {page}")
-                    return None
-        except asyncio.TimeoutError:
+            # While the circuit is open, wait out the cooldown (and the probe)
+            # rather than drop the page; once a probe has failed the API is
+            # considered down and the page's date keeps its previous file
+            probe = await circuit_breaker.acquire()
+            if circuit_breaker.gave_up:
+                logger.warning(f"Circuit breaker gave up, skipping {date} page {page}")
+                return None
+
+            # Wait for the global rate limit instead of a fixed per-request delay
+            await bucket.acquire()
+
+            response = await client.get(url)
+            if response.status_code == 200:
+                circuit_breaker.record_success()
+                await admission.record_success()
+                return orjson.loads(response.content)
+            elif response.status_code not in RETRYABLE_STATUSES:
+                # Not a rate limit or outage: the API is answering, so this
+                # still counts as a success for the circuit breaker
+                circuit_breaker.record_success()
+                logger.error(f"HTTP {response.status_code} for {date} page {page}")
+                return None
+
+            circuit_breaker.record_failure(probe)
+            if response.status_code == 403:
+                await admission.lower()
+            if attempt < MAX_RETRIES - 1:
+                logger.warning(f"HTTP {response.status_code} for {date} page {page}, attempt {attempt + 1}, retrying...")
+                retry_delay = retry_after_delay(response) or backoff_delay(attempt)
+                logger.info(f"Waiting {retry_delay:.1f} seconds before retry...")
+                await asyncio.sleep(retry_delay)
+                continue
+            logger.error(f"HTTP {response.status_code} for {date} page {page}")
+            return None
+        except httpx.TimeoutException:
             logger.error(f"Timeout fetching page {page} for {date}")
+            circuit_breaker.record_failure(probe)
             if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(RETRY_DELAY)
+                await asyncio.sleep(backoff_delay(attempt))
                 continue
             return None
         except Exception as e:
             logger.error(f"Error fetching page {page} for {date}: {e}")
+            circuit_breaker.record_failure(probe)
             if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(RETRY_DELAY)
+                await asyncio.sleep(backoff_delay(attempt))
                 continue
             return None
     return None
 
 
-async def fetch_all_pages_for_date(session: aiohttp.ClientSession, date: str, semaphore: asyncio.Semaphore) -> List[
-    Dict[str, Any]]:
+async def fetch_page_with_admission(client: httpx.AsyncClient, date: str, page: int,
+                                    admission: AdmissionController,
+                                    bucket: TokenBucket) -> Optional[Dict[str, Any]]:
     """
-    Fetch all pages for a given date concurrently
+    Fetch a single page once the admission controller lets it through
     """
-    all_events = []
+    async with admission:
+        logger.info(f"Fetching page {page} for {date}...")
+        return await fetch_page(client, date, page, admission, bucket)
 
-    # First, fetch page 1 to get total pages
-    async with semaphore:
-        logger.info(f"Fetching page 1 for {date} to get total pages...")
-        first_page_data = await fetch_page(session, date, 1)
 
-    if not first_page_data:
-        return []
+def queue_pages(client: httpx.AsyncClient, date: str, pages: range,
+                admission: AdmissionController, bucket: TokenBucket) -> List[asyncio.Task]:
+    """
+    Start an admission-guarded fetch task per page; tasks reach the admission
+    controller in the order they are queued
+    """
+    return [
+        asyncio.create_task(fetch_page_with_admission(client, date, page, admission, bucket))
+        for page in pages
+    ]
+
 
-    events = first_page_data.get('data', [])
-    all_events.extend(events)
+async def fetch_all_pages_for_date(client: httpx.AsyncClient, date: str, admission: AdmissionController,
+                                   bucket: TokenBucket, tasks: List[asyncio.Task]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch all pages for a given date concurrently, given the already queued
+    tasks for pages 1..SPECULATIVE_PAGES
+    Returns: the date's events, or None if any page could not be fetched
+    """
+    # The speculative pages were queued alongside page 1 instead of waiting
+    # for its meta; the ones past last_page are cancelled once it is known
+    first_page_data = await tasks[0]
 
-    meta = first_page_data.get('meta', {})
+    meta = first_page_data.get('meta', {}) if first_page_data else {}
     last_page = meta.get('last_page', 1)
 
+    # Drop speculative pages past the end, or all of them if page 1 failed
+    surplus = tasks[last_page:] if first_page_data else tasks[1:]
+    for task in surplus:
+        task.cancel()
+    await asyncio.gather(*surplus, return_exceptions=True)
+
+    if not first_page_data:
+        return None
+
+    results = []
     if last_page > 1:
         # Fetch remaining pages concurrently
-        tasks = []
-        for page in range(2, last_page + 1):
-            async def fetch_with_semaphore(p):
-                async with semaphore:
-                    logger.info(f"Fetching page {p} for {date}...")
-                    return await fetch_page(session, date, p)
-
-            tasks.append(fetch_with_semaphore(page))
+        remaining_pages = range(SPECULATIVE_PAGES + 1, last_page + 1)
+        tasks = tasks[1:last_page] + queue_pages(client, date, remaining_pages, admission, bucket)
 
         # Wait for all pages to complete
         results = await asyncio.gather(*tasks)
 
-        for result in results:
-            if result:
-                events = result.get('data', [])
-                all_events.extend(events)
+    # A missing page would leave the date's file silently truncated
+    missing_pages = [page for page, result in enumerate(results, start=2) if result is None]
+    if missing_pages:
+        logger.error(f"Could not fetch pages {missing_pages} for {date}")
+        return None
+
+    # Allocate the result list once from page 1's meta and copy each page into
+    # its own slot range; pages are capped at per_page so ranges never overlap.
+    # Events get their filterLocation/nearLocation in the same pass.
+    per_page = meta.get('per_page') or len(first_page_data.get('data', []))
+    all_events = [None] * (per_page * last_page)
+    for page, result in enumerate([first_page_data, *results], start=1):
+        offset = (page - 1) * per_page
+        for index, event in enumerate(result.get('data', [])[:per_page], start=offset):
+            place = event.get('place', '')
+            if place:
+                # Events at the same venue then share one string object: the
+                # location cache compares them by identity and duplicates are freed
+                place = event['place'] = sys.intern(place)
+            event['filterLocation'], event['nearLocation'] = normalize_and_locate(place)
+            all_events[index] = event
+
+    # A short last page leaves empty slots behind; every event is a non-empty
+    # dict by now (it carries its locations), so filter(None) drops only those
+    all_events = list(filter(None, all_events))
 
     logger.info(f"Total events for {date}: {len(all_events)}")
     return all_events
 
 
-def process_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def save_events_to_file(date: str, events: List[Dict[str, Any]], scraped_at: datetime):
     """
-    Process events to add filterLocation and nearLocation fields
+    Save already located events to a JSON file organized by date
     """
-    for event in events:
-        place = event.get('place', '')
-        filter_location, near_location = normalize_and_locate(place)
-        event['filterLocation'] = filter_location
-        event['nearLocation'] = near_location
+    # Format filename
+    filename = f"hacktown_events_{date}.json"
+    filepath = os.path.join(OUTPUT_DIR, filename)
+
+    # Prepare data structure
+    output_data = {
+        "date": date,
+        "total_events": len(events),
+        "scraped_at": scraped_at,
+        "events": events
+    }
 
-    return events
+    # Save to file; orjson emits UTF-8 bytes (like ensure_ascii=False) and
+    # serializes the aware datetime as ISO 8601 itself
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
 
+    logger.info(f"Saved {len(events)} events to {filepath}")
 
-def save_events_to_file(date: str, events: List[Dict[str, Any]]):
+
+def write_summary(filepath: str, summary_data: Dict[str, Any]):
     """
-    Save events to a JSON file organized by date
+    Write the run summary as indented JSON
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(summary_data, option=orjson.OPT_INDENT_2))
 
-    # Process events to add filterLocation
-    processed_events = process_events(events)
 
-    # Format filename
-    filename = f"hacktown_events_{date}.json"
-    filepath = os.path.join(OUTPUT_DIR, filename)
+def append_events_to_ndjson(filepath: str, events: List[Dict[str, Any]]):
+    """
+    Append events to an NDJSON file, one compact JSON object per line,
+    with a single write per batch
+    """
+    lines = b''.join(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE) for event in events)
 
-    # Get current time in BRT (Brasília Time)
-    utc_now = datetime.now(ZoneInfo('UTC'))
-    brt_now = utc_now.astimezone(ZoneInfo('America/Sao_Paulo'))
+    with ndjson_lock, open(filepath, 'ab') as f:
+        f.write(lines)
 
-    # Prepare data structure
-    output_data = {
-        "date": date,
-        "total_events": len(processed_events),
-        "scraped_at": brt_now.isoformat(),
-        "events": processed_events
-    }
+    logger.info(f"Appended {len(events)} events to {filepath}")
 
-    # Save to file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
 
-    logger.info(f"Saved {len(processed_events)} events to {filepath}")
+async def scrape_date(client: httpx.AsyncClient, date: str, admission: AdmissionController,
+                      bucket: TokenBucket, tasks: List[asyncio.Task], executor: ThreadPoolExecutor,
+                      scraped_at: datetime, ndjson_path: Optional[str] = None,
+                      previous_date: Optional[asyncio.Task] = None) -> Optional[int]:
+    """
+    Fetch all pages for a date and save them on the writer executor as soon as
+    they are in, so the file write overlaps with the other dates still fetching.
+    Events go to the date's JSON file, or are appended to ndjson_path when
+    given, after previous_date (the task of the date before) has finished
+    Returns: number of events saved, or None if the date failed and its
+    previous file was kept
+    """
+    events = await fetch_all_pages_for_date(client, date, admission, bucket, tasks)
+    if events is None:
+        logger.warning(f"Fetching {date} failed, keeping its previous file")
+        return None
+    if not events:
+        logger.warning(f"No events found for {date}")
+        return 0
+
+    # Serialize and write on a writer thread so in-flight requests keep flowing.
+    # A process pool would have to pickle the events over, which costs several
+    # times the orjson work it would offload.
+    loop = asyncio.get_running_loop()
+    if ndjson_path:
+        # Append after the date before has, so the stream follows EVENT_DATES
+        # order instead of whichever date finished fetching first
+        if previous_date is not None:
+            await asyncio.wait({previous_date})
+        await loop.run_in_executor(executor, append_events_to_ndjson, ndjson_path, events)
+    else:
+        await loop.run_in_executor(executor, save_events_to_file, date, events, scraped_at)
+    return len(events)
 
 
-async def fetch_all_dates(dates: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+async def fetch_all_dates(dates: List[str], executor: ThreadPoolExecutor, scraped_at: datetime,
+                          ndjson_path: Optional[str] = None) -> Dict[str, Optional[int]]:
     """
-    Fetch events for all dates concurrently
+    Fetch and save events for all dates concurrently
+    Returns: {date: number of events saved, or None if the date failed}
     """
     all_results = {}
 
-    # Create semaphore to limit concurrent requests
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-
-    # Create session with connection pooling - more conservative settings for CI
-    if IS_CI:
-        connector = aiohttp.TCPConnector(
-            limit=5,  # Much lower limit in CI
-            limit_per_host=2,  # Very conservative per-host limit
-            ttl_dns_cache=300,  # DNS cache timeout
-            force_close=True  # Force close connections after each request
-        )
-    else:
-        connector = aiohttp.TCPConnector(
-            limit=20,  # Reduced from 100
-            limit_per_host=10,  # Reduced from 30
-            ttl_dns_cache=300  # DNS cache timeout
-        )
-
-    # Create session with cookie jar to maintain session state
-    async with aiohttp.ClientSession(
-        connector=connector,
-        cookie_jar=aiohttp.CookieJar()
-    ) as session:
+    # Limit concurrent requests; 403s shrink the limit until enough requests succeed again
+    admission = AdmissionController(MAX_CONCURRENT_REQUESTS)
+
+    # Pace requests globally rather than with a random sleep in every task
+    bucket = TokenBucket(REQUESTS_PER_SECOND, RATE_LIMIT_BURST)
+
+    # Connection pool sized from the request limit so neither one silently caps the
+    # other; over HTTP/2 the in-flight pages share a multiplexed connection. Idle
+    # connections are kept alive in CI too, so later pages skip the DNS lookup
+    # and TCP+TLS handshake
+    limits = httpx.Limits(
+        max_connections=MAX_CONCURRENT_REQUESTS,
+        max_keepalive_connections=MAX_CONCURRENT_REQUESTS
+    )
+
+    # Create one client for the whole run: it keeps cookies, shared headers
+    # and timeout, and lets pages reuse pooled keep-alive connections
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=limits,
+        headers=HEADERS,
+        timeout=REQUEST_TIMEOUT
+    ) as client:
+        # Queue page 1 of every date ahead of any speculative page, so the
+        # admission controller serves discovery for all dates first instead of letting
+        # the first dates' speculative pages hold up the last date's page 1
+        queued = {date: queue_pages(client, date, range(1, 2), admission, bucket) for date in dates}
+        for date in dates:
+            queued[date] += queue_pages(client, date, range(2, SPECULATIVE_PAGES + 1), admission, bucket)
+
         tasks = []
+        previous_date = None
         for date in dates:
-            task = fetch_all_pages_for_date(session, date, semaphore)
-            tasks.append(task)
+            previous_date = asyncio.create_task(scrape_date(
+                client, date, admission, bucket, queued[date], executor, scraped_at, ndjson_path, previous_date
+            ))
+            tasks.append(previous_date)
 
         # Fetch all dates concurrently
         results = await asyncio.gather(*tasks)
 
         # Map results to dates
-        for date, events in zip(dates, results):
-            all_results[date] = events
+        for date, event_count in zip(dates, results):
+            all_results[date] = event_count
 
     return all_results
 
 
-async def main():
+async def main(ndjson: bool = False):
     """
     Main function to orchestrate the scraping process
+    With ndjson=True all events go to one NDJSON file instead of per-date JSON
     """
     logger.info("Starting Hacktown 2025 Event Scraper (Async Version)")
     logger.info("=" * 50)
 
     start_time = time.time()
+    # Time in BRT (Brasília Time) stamped on every per-date file of this run
+    scraped_at = datetime.now(BRT)
+
+    # Create output directory once, before any date or summary is written
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     # Load existing summary if it exists
     summary_file = os.path.join(OUTPUT_DIR, "summary.json")
     existing_summary = {}
     if os.path.exists(summary_file):
         try:
-            with open(summary_file, 'r', encoding='utf-8') as f:
-                existing_summary = json.load(f)
+            with open(summary_file, 'rb') as f:
+                existing_summary = orjson.loads(f.read())
             logger.info(f"Loaded existing summary with {existing_summary.get('total_events', 0)} events")
         except Exception as e:
             logger.warning(f"Could not load existing summary: {e}")
 
-    # Fetch all events concurrently
-    all_events = await fetch_all_dates(EVENT_DATES)
-
-    # Track statistics
-    total_events = 0
-    fetch_successful = False
-
-    # Save results
-    for date, events in all_events.items():
-        if events:
-            save_events_to_file(date, events)
-            total_events += len(events)
-            fetch_successful = True
+    # In NDJSON mode events are appended to a partial file that only replaces
+    # the previous one if the fetch succeeds, like the per-date files
+    ndjson_file = os.path.join(OUTPUT_DIR, NDJSON_FILENAME)
+    ndjson_partial = f"{ndjson_file}.partial" if ndjson else None
+    if ndjson_partial:
+        open(ndjson_partial, 'wb').close()
+
+    # File writes run on a small dedicated pool rather than the loop's default
+    # executor, so they never queue behind (or crowd out) other blocking calls
+    executor = ThreadPoolExecutor(max_workers=WRITER_THREADS, thread_name_prefix="writer")
+
+    # Fetch all events concurrently; each date is saved as soon as it completes
+    event_counts = await fetch_all_dates(EVENT_DATES, executor, scraped_at, ndjson_partial)
+
+    # Track statistics; a single failed date keeps the previous summary, since
+    # its file (or the NDJSON stream) no longer matches this run's totals
+    failed_dates = [date for date, event_count in event_counts.items() if event_count is None]
+    total_events = sum(event_count for event_count in event_counts.values() if event_count is not None)
+    fetch_successful = total_events > 0 and not failed_dates
+
+    if ndjson_partial:
+        if fetch_successful:
+            os.replace(ndjson_partial, ndjson_file)
         else:
-            logger.warning(f"No events found for {date}")
+            os.remove(ndjson_partial)
 
     elapsed_time = time.time() - start_time
 
@@ -426,38 +782,54 @@ async def main():
     logger.info(f"Files saved in: {os.path.abspath(OUTPUT_DIR)}")
 
     # Get current time in BRT
-    utc_now = datetime.now(ZoneInfo('UTC'))
-    brt_now = utc_now.astimezone(ZoneInfo('America/Sao_Paulo'))
+    brt_now = datetime.now(BRT)
 
     # Prepare summary data
     if fetch_successful:
         # Update with new data if fetch was successful
         summary_data = {
-            "scraping_completed": brt_now.isoformat(),
+            "scraping_completed": brt_now,
             "total_events": total_events,
             "dates_processed": EVENT_DATES,
-            "files_created": [f"hacktown_events_{date}.json" for date in EVENT_DATES],
+            "files_created": [NDJSON_FILENAME] if ndjson else [f"hacktown_events_{date}.json" for date in EVENT_DATES],
             "scraping_time_seconds": round(elapsed_time, 2)
         }
         logger.info("Fetch successful - updating summary with new data")
     else:
         # Preserve old values if fetch failed
         summary_data = {
-            "scraping_completed": existing_summary.get("scraping_completed", brt_now.isoformat()),
+            "scraping_completed": existing_summary.get("scraping_completed", brt_now),
             "total_events": existing_summary.get("total_events", 0),
             "dates_processed": EVENT_DATES,
             "files_created": existing_summary.get("files_created", []),
             "scraping_time_seconds": round(elapsed_time, 2),
-            "last_failed_attempt": brt_now.isoformat()
+            "last_failed_attempt": brt_now,
+            "failed_dates": failed_dates
         }
         logger.warning("Fetch failed - preserving existing summary values")
 
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump(summary_data, f, indent=2)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, write_summary, summary_file, summary_data)
+    await loop.run_in_executor(executor, save_location_cache)
+    executor.shutdown()
 
     logger.info(f"Summary saved to: {summary_file}")
-    logger.info(f"Location cache efficiency: {len(location_cache)} unique locations cached")
+    logger.info(f"Location cache efficiency: {normalize_and_locate.cache_info().currsize} unique locations cached")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Hacktown 2025 events")
+    parser.add_argument('--ndjson', action='store_true',
+                        help=f"write all events to {OUTPUT_DIR}/{NDJSON_FILENAME}, one per line, "
+                             "instead of per-date JSON files")
+    args = parser.parse_args()
+
+    # uvloop is a faster drop-in event loop. From Python 3.12 asyncio.run takes
+    # it as a loop factory; installing it as the global policy is deprecated there
+    if uvloop is None:
+        asyncio.run(main(ndjson=args.ndjson))
+    elif sys.version_info >= (3, 12):
+        asyncio.run(main(ndjson=args.ndjson), loop_factory=uvloop.new_event_loop)
+    else:
+        uvloop.install()
+        asyncio.run(main(ndjson=args.ndjson))
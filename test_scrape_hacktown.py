@@ -0,0 +1,120 @@
+"""
+Circuit breaker scenarios for the scraper, run against an in-process mock of
+the events API (httpx.MockTransport). Run with: python -m unittest
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import httpx
+import orjson
+
+import scrape_hacktown
+
+DATES = ["2025-07-30", "2025-07-31", "2025-08-01"]
+EVENT_COUNTS = {"2025-07-30": 3, "2025-07-31": 23, "2025-08-01": 12}
+PER_PAGE = 5
+
+
+class MockAPI:
+    """
+    Serves EVENT_COUNTS in pages of PER_PAGE, answering `fail_status` to every
+    request for which fail(request_number, seconds_since_start) is true
+    """
+
+    def __init__(self, fail, fail_status: int):
+        self.fail = fail
+        self.fail_status = fail_status
+        self.requests = 0
+        self.started = time.monotonic()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.fail(self.requests, time.monotonic() - self.started):
+            return httpx.Response(self.fail_status)
+
+        date = request.url.params.get_list('day[]')[0]
+        page = int(request.url.params['page'])
+        total = EVENT_COUNTS[date]
+        events = [{"id": f"{date}-{i}", "place": "INATEL - Sala 1"}
+                  for i in range((page - 1) * PER_PAGE, min(total, page * PER_PAGE))]
+        meta = {"last_page": max(1, -(-total // PER_PAGE)), "per_page": PER_PAGE}
+        return httpx.Response(200, content=orjson.dumps({"data": events, "meta": meta}))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(workdir.name)
+
+        # The previous run's output, which a failed run must leave alone
+        os.makedirs(scrape_hacktown.OUTPUT_DIR)
+        self.previous_file = os.path.join(scrape_hacktown.OUTPUT_DIR, f"hacktown_events_{DATES[1]}.json")
+        with open(self.previous_file, 'wb') as f:
+            f.write(b'{"previous": true}')
+        with open(os.path.join(scrape_hacktown.OUTPUT_DIR, "summary.json"), 'wb') as f:
+            f.write(orjson.dumps({"total_events": 99}))
+
+        for name, value in {
+            'EVENT_DATES': DATES,
+            'MAX_CONCURRENT_REQUESTS': 1,
+            'RETRY_DELAY': 0.01,
+            'REQUESTS_PER_SECOND': 1000.0,
+            'circuit_breaker': scrape_hacktown.CircuitBreaker(threshold=4, cooldown=0.3),
+        }.items():
+            patcher = mock.patch.object(scrape_hacktown, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_scraper(self, api: MockAPI) -> dict:
+        client = functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(api))
+        with mock.patch.object(scrape_hacktown.httpx, 'AsyncClient', client):
+            asyncio.run(scrape_hacktown.main())
+        with open(os.path.join(scrape_hacktown.OUTPUT_DIR, "summary.json"), 'rb') as f:
+            return orjson.loads(f.read())
+
+    def test_outage_fails_fast_and_keeps_previous_files(self):
+        api = MockAPI(lambda request, elapsed: True, 503)
+        summary = self.run_scraper(api)
+
+        # The threshold's worth of failures plus the one failed probe
+        self.assertEqual(api.requests, 5)
+        with open(self.previous_file, 'rb') as f:
+            self.assertEqual(f.read(), b'{"previous": true}')
+        self.assertEqual(summary["total_events"], 99)
+        self.assertEqual(summary["failed_dates"], DATES)
+
+    def test_short_storm_is_held_and_every_file_is_complete(self):
+        # 403s for a moment after the first few pages, shorter than the cooldown
+        storm = {}
+
+        def fail(request, elapsed):
+            if request == 3:
+                storm['start'] = elapsed
+            return 'start' in storm and elapsed - storm['start'] < 0.1
+
+        summary = self.run_scraper(MockAPI(fail, 403))
+
+        for date in DATES:
+            with open(os.path.join(scrape_hacktown.OUTPUT_DIR, f"hacktown_events_{date}.json"), 'rb') as f:
+                events = orjson.loads(f.read())["events"]
+            self.assertEqual([event["id"] for event in events],
+                             [f"{date}-{i}" for i in range(EVENT_COUNTS[date])])
+        self.assertEqual(summary["total_events"], sum(EVENT_COUNTS.values()))
+        self.assertNotIn("failed_dates", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()